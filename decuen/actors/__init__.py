@@ -1,11 +1,13 @@
 """Actor-learner interfaces and implementations for generating and learning behavioral policies."""
 
 from decuen.actors._actor import Actor, ActorSettings
+from decuen.actors.asynchronous import AsyncActor
 from decuen.actors.pg import PGActor, PGActorSettings
 from decuen.actors.strategy import StrategyActor, StrategyActorSettings
 
 __all__ = [
     "Actor", "ActorSettings",
     "StrategyActor", "StrategyActorSettings",
-    "PGActor", "PGActorSettings"
+    "PGActor", "PGActorSettings",
+    "AsyncActor",
 ]
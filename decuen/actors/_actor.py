@@ -3,16 +3,18 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from functools import reduce
-from typing import Generic, MutableSequence, Optional, Type, TypeVar
+from typing import Callable, Dict, Generic, MutableSequence, Optional, Type, TypeVar
 
-from gym.spaces import Box, Discrete  # type: ignore
-from torch import diag_embed
+from gym.spaces import Box, Discrete, Space  # type: ignore
+from torch import no_grad, rand_like, searchsorted  # pylint: disable=no-name-in-module
 from torch.nn.functional import softplus
 
 from decuen.critics import Critic
-from decuen.dists import Categorical, Distribution, MultivariateNormal, Normal
-from decuen.structs import State, Tensor, Trajectory
+from decuen.dists import (Categorical, Distribution, Independent,
+                          MultivariateNormal, Normal)
+from decuen.structs import Action, BatchedTransitions, State, Tensor
 from decuen.utils.context import Contextful
+from decuen.utils.function_property import FunctionProperty
 
 
 @dataclass
@@ -23,6 +25,76 @@ class ActorSettings:
     discount_factor: float
 
 
+def _categorical_num_params(action_space: Space) -> int:
+    if not isinstance(action_space, Discrete):
+        raise TypeError("categorical distributions for actions can only be used for a Discrete action space")
+    return action_space.n
+
+
+def _normal_num_params(action_space: Space) -> int:
+    if isinstance(action_space, Box) and action_space.shape != (1,):
+        raise TypeError("univariate normal distribution can only be used with unidimensional action spaces")
+    return 2
+
+
+def _multivariate_normal_num_params(action_space: Space) -> int:
+    if isinstance(action_space, Discrete):
+        raise TypeError("mutivariate normal distribution cannot be used with Discrete action spaces")
+    return 2 * reduce((lambda x, y: x * y), action_space.shape)
+
+
+# Number of policy parameters needed by each supported distribution family for a given action space
+_NUM_POLICY_PARAMS: Dict[Type[Distribution], Callable[[Space], int]] = {
+    Categorical: _categorical_num_params,
+    Normal: _normal_num_params,
+    MultivariateNormal: _multivariate_normal_num_params,
+}
+
+
+def _num_policy_params(dist: Type[Distribution], action_space: Space) -> int:
+    """Calculate the number of parameters needed for a policy of the given distribution over an action space."""
+    if not isinstance(action_space, (Discrete, Box)):
+        raise TypeError("actors only support Discrete, Box action spaces")
+    if dist not in _NUM_POLICY_PARAMS:
+        raise NotImplementedError("actors do not support this action distribution yet")
+    return _NUM_POLICY_PARAMS[dist](action_space)
+
+
+def _categorical_behaviour(params: Tensor) -> Distribution:
+    return Categorical(logits=params)
+
+
+def _normal_behaviour(params: Tensor) -> Distribution:
+    return Normal(params[:, 0], params[:, 1])
+
+
+def _multivariate_normal_behaviour(params: Tensor) -> Distribution:
+    # A diagonal covariance is represented as independent normals, avoiding the dense covariance matrix entirely
+    mean, raw_variance = params.chunk(2, dim=1)
+    return Independent(Normal(mean, softplus(raw_variance).sqrt()), 1)
+
+
+def _behaviour_constructor(dist: Type[Distribution]) -> Callable[[Tensor], Distribution]:
+    """Select the function used to construct a behavioural policy of the given distribution from its parameters."""
+    if dist is Categorical:
+        return _categorical_behaviour
+    if dist is Normal:
+        return _normal_behaviour
+    if dist is MultivariateNormal:
+        return _multivariate_normal_behaviour
+    raise NotImplementedError("actors do not support this action distribution yet")
+
+
+def _categorical_sample(params: Tensor) -> Tensor:
+    """Sample from categorical distributions parameterized by logits using inverse transform sampling.
+
+    Avoids constructing and validating a full distribution object just to draw a sample.
+    """
+    cumulative = params.softmax(-1).cumsum(-1)
+    uniform = rand_like(cumulative[..., :1])
+    return searchsorted(cumulative, uniform).squeeze(-1).clamp_(max=params.size()[-1] - 1)
+
+
 CriticType = TypeVar("CriticType", bound=Critic)
 
 
@@ -37,6 +109,12 @@ class Actor(Generic[CriticType], ABC, Contextful):
     settings: ActorSettings
 
     _critic: Optional[CriticType]
+    # Number of parameters needed for the policy
+    _num_policy_params: int
+    # Constructor of the behavioural policy from policy parameters
+    _behaviour: FunctionProperty[Callable[[Tensor], Distribution]]
+    # Sampler of a single action from the policy parameters of a single state
+    _sample_single: FunctionProperty[Callable[[Tensor], Action]]
 
     @abstractmethod
     def __init__(self, settings: ActorSettings) -> None:
@@ -45,6 +123,12 @@ class Actor(Generic[CriticType], ABC, Contextful):
         self.settings = settings
 
         self._critic = None
+        self._num_policy_params = _num_policy_params(settings.dist, self.action_space)
+        self._behaviour = _behaviour_constructor(settings.dist)
+        if settings.dist is Categorical:
+            self._sample_single = _categorical_sample
+        else:
+            self._sample_single = lambda params: self._behaviour(params.unsqueeze(0)).sample()[0]
 
     @property
     def critic(self) -> CriticType:
@@ -65,10 +149,27 @@ class Actor(Generic[CriticType], ABC, Contextful):
         """Construct a parameterized policy and return the generated distribution."""
         return self._gen_behaviour(self._gen_policy_params(state))
 
+    @no_grad()
+    def act_single(self, state: State) -> Action:
+        """Sample an action from the policy generated for a single unbatched state.
+
+        Bypasses the dimensionality dispatch of `act` by viewing the generated parameters as a batch of one, and samples
+        categorical policies directly from their cumulative distribution.
+        """
+        return self._sample_single(self._gen_policy_params(state))
+
+    @no_grad()
+    def act_batch(self, states: State) -> Action:
+        """Sample an action for every state in a batch of states.
+
+        Generates a single batched distribution for all states and samples it once rather than per state.
+        """
+        return self._behaviour(self._gen_policy_params(states)).sample()
+
     # TODO: support learning from transitions
     # XXX: possibly return loss or some other metric?
     @abstractmethod
-    def learn(self, trajectories: MutableSequence[Trajectory]) -> None:
+    def learn(self, trajectories: MutableSequence[BatchedTransitions]) -> None:
         """Update policy based on past trajectories."""
         ...
 
@@ -77,33 +178,6 @@ class Actor(Generic[CriticType], ABC, Contextful):
         """Generate policy parameters on-the-fly based on an environment state."""
         ...
 
-    @property
-    def _num_policy_params(self) -> int:
-        """Calculate the number of parameters needed for the policy."""
-        if not any(isinstance(self.action_space, space_type) for space_type in (Discrete, Box)):
-            raise TypeError("actors only support Discrete, Box action spaces")
-
-        if self.settings.dist is Categorical:
-            if not isinstance(self.action_space, Discrete):
-                raise TypeError("categorical distributions for actions can only be used for a Discrete action space")
-            return self.action_space.n
-
-        if self.settings.dist is Normal:
-            if isinstance(self.action_space, Discrete):
-                return 2
-            if isinstance(self.action_space, Box):
-                if self.action_space.shape != (1,):
-                    raise TypeError("univariate normal distribution can only be used with unidimensional action spaces")
-                return 2
-
-        if self.settings.dist is MultivariateNormal:
-            if isinstance(self.action_space, Discrete):
-                raise TypeError("mutivariate normal distribution cannot be used with Discrete action spaces")
-            if isinstance(self.action_space, Box):
-                return 2 * reduce((lambda x, y: x * y), self.action_space.shape)
-
-        raise NotImplementedError("actors do not support this action distribution yet")
-
     def _gen_behaviour(self, params: Tensor) -> Distribution:
         """Generate the behavioural policy based on the given parameters and the distribution family of this actor."""
         # TODO: check for parameter size mismatches
@@ -115,14 +189,4 @@ class Actor(Generic[CriticType], ABC, Contextful):
             # FIXME: better error message
             raise ValueError("unknown dimensionality")
 
-        if self.settings.dist is Categorical:
-            return Categorical(logits=params)
-
-        if self.settings.dist is Normal:
-            return Normal(params[:, 0], params[:, 1])
-
-        if self.settings.dist is MultivariateNormal:
-            half = params.size()[1] // 2
-            return MultivariateNormal(params[:, :half], diag_embed(softplus(params[:, half:])))
-
-        raise NotImplementedError("actors do not support this action distribution yet")
+        return self._behaviour(params)
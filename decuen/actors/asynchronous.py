@@ -0,0 +1,94 @@
+"""Implementation of an asynchronous batching wrapper around actors.
+
+Allows many environments to submit states independently while the wrapped actor generates actions for all pending states
+in a single batched pass.
+"""
+
+import queue
+import threading
+from typing import Generic, List, Optional, Tuple, Union
+
+from decuen.actors._actor import Actor, CriticType
+from decuen.structs import Action, State, stack
+
+
+class AsyncActor(Generic[CriticType]):
+    """Asynchronous batching actor.
+
+    States are submitted per environment with `send` and the generated actions are received, tagged with the environment
+    they belong to, with `recv`. A worker thread collects up to `batch_size` pending states at a time and acts on all of
+    them in a single pass of the wrapped actor, which must therefore support batched states. Errors raised by the
+    wrapped actor are raised from `recv` in place of the action of every environment in the batch they occurred in.
+
+    Since the worker evaluates the wrapped actor concurrently with the caller, the wrapped actor must not learn while
+    this wrapper is in use, e.g. learning must wait until all submitted states have been received or this is closed.
+    """
+
+    actor: Actor[CriticType]
+    batch_size: int
+
+    _requests: 'queue.Queue[Optional[Tuple[int, State]]]'
+    _responses: 'queue.Queue[Tuple[int, Union[Action, Exception]]]'
+    _worker: threading.Thread
+    # Buffer the worker stacks pending states into, allocated on the device of states once their shape is known
+    _scratch: Optional[State]
+
+    def __init__(self, actor: Actor[CriticType], batch_size: int) -> None:
+        """Initialize an asynchronous actor and start its worker."""
+        self.actor = actor
+        self.batch_size = batch_size
+
+        self._requests = queue.Queue()
+        self._responses = queue.Queue()
+        self._scratch = None
+        self._worker = threading.Thread(target=self._work, daemon=True)
+        self._worker.start()
+
+    def send(self, env_id: int, state: State) -> None:
+        """Submit a state from an environment to be acted upon."""
+        self._requests.put((env_id, state))
+
+    def recv(self, timeout: Optional[float] = None) -> Tuple[int, Action]:
+        """Receive the next generated action along with the identifier of the environment it was generated for."""
+        env_id, response = self._responses.get(timeout=timeout)
+        if isinstance(response, Exception):
+            raise RuntimeError(f"failed to act for environment {env_id}") from response
+        return env_id, response
+
+    def close(self) -> None:
+        """Stop the worker once all previously submitted states have been acted upon."""
+        self._requests.put(None)
+        self._worker.join()
+
+    def _work(self) -> None:
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+
+            batch: List[Tuple[int, State]] = [request]
+            stopping = False
+            while len(batch) < self.batch_size:
+                try:
+                    request = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+
+            env_ids, states = zip(*batch)
+            try:
+                if self._scratch is None or self._scratch.device != states[0].device:
+                    self._scratch = states[0].new_empty((self.batch_size, *states[0].size()))
+                actions = self.actor.act_batch(stack(states, out=self._scratch))
+            except Exception as error:  # pylint: disable=broad-except
+                for env_id in env_ids:
+                    self._responses.put((env_id, error))
+            else:
+                for env_id, action in zip(env_ids, actions.unbind()):
+                    self._responses.put((env_id, action))
+
+            if stopping:
+                return
@@ -4,23 +4,64 @@ Based on REINFORCE algorithm with causality and baselines.
 """
 
 from dataclasses import dataclass
-from typing import MutableSequence
+from typing import Callable, MutableSequence
 
-from torch import from_numpy
+from torch import cat, from_numpy, no_grad, std_mean  # pylint: disable=no-name-in-module
+from torch.jit import script
 from torch.nn import Module
 from torch.optim import Optimizer  # type: ignore
 
 from decuen.actors._actor import Actor, ActorSettings
 from decuen.critics import Critic
-from decuen.structs import State, Tensor, Trajectory, batch_transitions
+from decuen.dists import Distribution
+from decuen.structs import (BatchedTransitions, Device, State, Tensor,
+                            concatenate_batches)
+from decuen.utils.compilation import compile_if_available
+from decuen.utils.function_property import FunctionProperty
 from decuen.utils.module_construction import finalize_module
 
 
+@script
+def _normalize(advantages: Tensor) -> Tensor:
+    """Normalize advantages to zero mean and unit variance computing both moments in a single reduction.
+
+    The biased standard deviation is used so that a single advantage normalizes to zero rather than to NaN.
+    """
+    std, mean = std_mean(advantages, unbiased=False)
+    return (advantages - mean) / (std + 1e-8)
+
+
+@script
+def _pg_loss(neglogs: Tensor, advantages: Tensor, normalize: bool) -> Tensor:
+    """Compute the policy-gradient loss from negative log-probabilities of actions and their advantages."""
+    if normalize:
+        advantages = _normalize(advantages)
+    return (neglogs * advantages).sum()
+
+
+def _policy_loss(behaviour: Callable[[Tensor], Distribution],
+                 normalize: bool) -> Callable[[Tensor, Tensor, Tensor], Tensor]:
+    """Construct a function computing the policy-gradient loss directly from policy parameters.
+
+    The behavioural distribution is constructed within the function so that compiling it can fuse the log-probability
+    computation and advantage normalization with the loss reduction. Whether to normalize is fixed at construction so
+    that the compiled graph has no data-dependent branches.
+    """
+    def loss(params: Tensor, actions: Tensor, advantages: Tensor) -> Tensor:
+        if normalize:
+            advantages = _normalize(advantages)
+        return (-behaviour(params).log_prob(actions) * advantages).sum()
+    return loss
+
+
 @dataclass
 class PGActorSettings(ActorSettings):
     """Basic common settings for all actor-learners."""
 
     optimizer: Optimizer
+    compiled: bool = False
+    accumulation_steps: int = 1
+    normalize: bool = False
 
 
 class PGActor(Actor[Critic]):
@@ -30,6 +71,9 @@ class PGActor(Actor[Critic]):
     """
 
     settings: PGActorSettings
+    _loss: FunctionProperty[Callable[[Tensor, Tensor, Tensor], Tensor]]
+    # Number of learning calls whose gradients have been accumulated since the last optimizer step
+    _accumulated: int
 
     def __init__(self, model: Module, settings: PGActorSettings) -> None:
         """Initialize a policy-gradient actor-learner."""
@@ -39,20 +83,50 @@ class PGActor(Actor[Critic]):
                                                     self._num_policy_params)
         self.settings.optimizer.add_param_group({"params": final_layer.parameters()})
 
-    def learn(self, trajectories: MutableSequence[Trajectory]) -> None:
-        """Update policy based on past trajectories."""
-        for trajectory in trajectories:
-            batch = batch_transitions(trajectory)
-            policies = self.act(batch.states)
-            neglog = -policies.log_prob(batch.actions)
-
-            advantage = self.critic.advantage(trajectory)
+        self._accumulated = 0
+
+        if self.settings.compiled:
+            self.network = compile_if_available(self.network, mode="reduce-overhead")
+            with no_grad():
+                self.network(from_numpy(self.state_space.sample()).float())
+            self._loss = compile_if_available(_policy_loss(self._behaviour, self.settings.normalize),
+                                              fullgraph=False, mode="reduce-overhead")
+        else:
+            self._loss = self._scripted_loss
+
+    def learn(self, trajectories: MutableSequence[BatchedTransitions]) -> None:
+        """Update policy based on past trajectories.
+
+        All trajectories are concatenated into a single batch so that the update takes one forward and backward pass.
+        Gradients are accumulated over `accumulation_steps` calls before the policy is actually stepped, which allows
+        for larger effective batches than fit in memory at once.
+        """
+        if not trajectories:
+            return
+
+        batch = concatenate_batches(trajectories).to(self.device)
+        params = self._gen_policy_params(batch.states)
+        # Critics may produce advantages on another device, so move them alongside the batch ahead of the loss
+        advantages = cat([self.critic.advantage(trajectory) for trajectory in trajectories])
+        advantages = advantages.to(self.device, non_blocking=True)
+
+        loss = self._loss(params, batch.actions, advantages) / self.settings.accumulation_steps
+        loss.backward()
+
+        self._accumulated += 1
+        if self._accumulated == self.settings.accumulation_steps:
+            self.settings.optimizer.step()
+            self.settings.optimizer.zero_grad()
+            self._accumulated = 0
 
-            loss = (neglog * advantage).sum()
+    @property
+    def device(self) -> Device:
+        """Get the device the policy network lives on."""
+        return next(self.network.parameters()).device
 
-            self.settings.optimizer.zero_grad()
-            loss.backward()
-            self.settings.optimizer.step()
+    def _scripted_loss(self, params: Tensor, actions: Tensor, advantages: Tensor) -> Tensor:
+        """Compute the policy-gradient loss with the scripted reduction."""
+        return _pg_loss(-self._behaviour(params).log_prob(actions), advantages, self.settings.normalize)
 
     def _gen_policy_params(self, state: State) -> Tensor:
         """Generate policy parameters on-the-fly based on an environment state."""
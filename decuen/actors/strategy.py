@@ -4,12 +4,12 @@ from dataclasses import dataclass
 from typing import MutableSequence
 
 from gym.spaces import Discrete  # type: ignore
-from torch import arange
+from torch import arange, no_grad  # pylint: disable=no-name-in-module
 
 from decuen.actors._actor import Actor, ActorSettings
 from decuen.actors.strats import Strategy
 from decuen.critics import QValueCritic
-from decuen.structs import State, Tensor, Trajectory
+from decuen.structs import BatchedTransitions, State, Tensor
 
 
 @dataclass
@@ -24,20 +24,31 @@ class StrategyActor(Actor[QValueCritic]):
     """
 
     settings: StrategyActorSettings
+    # Indices of every action in the discrete action space, kept on the device of the critic
+    _actions: Tensor
 
     def __init__(self, strategy: Strategy, settings: StrategyActorSettings) -> None:
         """Initialize a strategy actor."""
         super().__init__(settings)
+        if not isinstance(self.action_space, Discrete):
+            raise NotImplementedError("strategy actor does not support non-discrete action spaces")
+
         self.strategy = strategy
+        self._actions = arange(self.action_space.n)
+
+    @Actor.critic.setter  # type: ignore
+    def critic(self, critic: QValueCritic) -> None:
+        """Set the critic of this actor and move the action indices onto its device.
 
-    def learn(self, trajectories: MutableSequence[Trajectory]) -> None:
+        You probably do not want to do this manually.
+        """
+        Actor.critic.fset(self, critic)  # type: ignore  # pylint: disable=no-member
+        self._actions = self._actions.to(critic.device)
+
+    def learn(self, trajectories: MutableSequence[BatchedTransitions]) -> None:
         """Do nothing. Learning is not supported for strategy-based actors."""
 
+    @no_grad()
     def _gen_policy_params(self, state: State) -> Tensor:
         """Generate policy parameters on-the-fly based on an environment state."""
-        if not self.critic:
-            raise ValueError("strategy actor must be assigned a critic")
-        if not isinstance(self.action_space, Discrete):
-            raise NotImplementedError("strategy actor does not support non-discrete action spaces")
-
-        return self.strategy.act(self.critic.crit(state, arange(self.action_space.n)))
+        return self.strategy.act(self.critic.crit(state, self._actions))
@@ -4,24 +4,43 @@
 """
 
 from torch.distributions import Categorical
+from torch.jit import script
 
 from decuen.actors.strats._strategy import Strategy
 from decuen.structs import Tensor
 
 
+@script
+def _boltzmann(action_values: Tensor, inverse_temperature: float) -> Tensor:
+    return (action_values * inverse_temperature).softmax(-1)
+
+
 # pylint: disable=too-few-public-methods
 class BoltzmannStrategy(Strategy):
     """Boltzmann action selection strategy."""
 
+    # Reciprocal of the temperature, kept so that action-values are scaled by a multiplication rather than a division
+    _inverse_temperature: float
+
     def __init__(self, temperature: float = 1) -> None:
         """Initialize a Boltzmann strategy."""
         super().__init__(Categorical)
         self.temperature = temperature
 
+    @property
+    def temperature(self) -> float:
+        """Get the temperature of the softmax."""
+        return 1 / self._inverse_temperature
+
+    @temperature.setter
+    def temperature(self, value: float) -> None:
+        """Set the temperature of the softmax."""
+        self._inverse_temperature = 1 / value
+
     def act(self, action_values: Tensor) -> Tensor:
         """Generate the parameters for a categorical action distribution based on the action-value logits.
 
-        Computes a softmax over the action-values and returns those as parameters to a categorical distribution.
+        Computes a softmax over the action-values and returns those as parameters to a categorical distribution. Batches
+        of action-values are handled in a single softmax over the last dimension.
         """
-        action_values /= self.temperature
-        return action_values.softmax(0)
+        return _boltzmann(action_values, self._inverse_temperature)
@@ -3,6 +3,8 @@
 from abc import ABC, abstractmethod
 from typing import Callable, ClassVar, Optional
 
+from torch.jit import script
+
 from decuen.actors.strats._strategy import Strategy
 from decuen.actors.strats.greedy import GreedyStrategy
 from decuen.actors.strats.uniform import UniformStrategy
@@ -81,6 +83,15 @@ class ExponentialEpsilonDecay(EpsilonDecay):
         return value * self.factor
 
 
+# Distance from zero or one within which epsilon is treated as exactly purely greedy or purely random
+_EPSILON_TOLERANCE = 1e-6
+
+
+@script
+def _mix(greedy_probs: Tensor, random_probs: Tensor, epsilon: float) -> Tensor:
+    return (1 - epsilon) * greedy_probs + epsilon * random_probs
+
+
 # pylint: disable=too-few-public-methods
 class EpsilonGreedyStrategy(Strategy):
     """Epsilon-greedy action selection strategy."""
@@ -106,7 +117,13 @@ class EpsilonGreedyStrategy(Strategy):
 
         Decays epsilon according to the decay mechanism after choosing an action.
         """
-        probs = (1 - self.epsilon) * self.greedy.act(action_values) + self.epsilon * self.random.act(action_values)
+        # Skip computing the branch that would be weighted away entirely at the extremes of epsilon
+        if self.epsilon < _EPSILON_TOLERANCE:
+            probs = self.greedy.act(action_values)
+        elif self.epsilon > 1 - _EPSILON_TOLERANCE:
+            probs = self.random.act(action_values)
+        else:
+            probs = _mix(self.greedy.act(action_values), self.random.act(action_values), self.epsilon)
         self.decay()
         return probs
 
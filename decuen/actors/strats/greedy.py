@@ -1,12 +1,18 @@
 """Implementation of a greedy action selection strategy."""
 
-from torch import zeros
+from torch.jit import script
+from torch.nn.functional import one_hot
 
 from decuen.actors.strats._strategy import Strategy
 from decuen.dists import Categorical
 from decuen.structs import Tensor
 
 
+@script
+def _greedy(action_values: Tensor) -> Tensor:
+    return one_hot(action_values.argmax(-1), action_values.size(-1)).to(action_values.dtype)
+
+
 # pylint: disable=too-few-public-methods
 class GreedyStrategy(Strategy):
     """Greedy action selection strategy."""
@@ -17,6 +23,4 @@ class GreedyStrategy(Strategy):
 
     def act(self, action_values: Tensor) -> Tensor:
         """Generate parameters for a categorical distribution that assigns full probability to one action greedily."""
-        probs = zeros(action_values.size())
-        probs[action_values.argmax()] = 1
-        return probs
+        return _greedy(action_values)
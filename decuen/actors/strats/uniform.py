@@ -1,12 +1,18 @@
 """Implementation of a random action selection strategy."""
 
-from torch import ones
+from torch import ones_like  # pylint: disable=no-name-in-module
+from torch.jit import script
 
 from decuen.actors.strats._strategy import Strategy
 from decuen.dists import Categorical
 from decuen.structs import Tensor
 
 
+@script
+def _uniform(action_values: Tensor) -> Tensor:
+    return ones_like(action_values) / action_values.size(-1)
+
+
 # pylint: disable=too-few-public-methods
 class UniformStrategy(Strategy):
     """Uniform action selection strategy."""
@@ -17,4 +23,4 @@ class UniformStrategy(Strategy):
 
     def act(self, action_values: Tensor) -> Tensor:
         """Generate parameters for a uniform categorical distribution."""
-        return ones(action_values.size()) / action_values.numel()
+        return _uniform(action_values)
@@ -1,20 +1,55 @@
 """Interfaces for arbitrary reinforcement learning agents."""
 
+import queue
+import threading
 from dataclasses import dataclass
-from typing import List, Optional
+from functools import partial
+from typing import Any, Callable, List, Optional, Tuple
 
 import numpy as np  # type: ignore
+from torch import from_numpy  # pylint: disable=no-name-in-module
 
 from decuen.actors import Actor
 from decuen.critics import Critic
 from decuen.memories import Memory
-from decuen.structs import Action, State, Transition, tensor
+from decuen.structs import Action, State, Tensor, Transition
+from decuen.utils.checks import (check_action, check_actions, check_state,
+                                 check_states)
 from decuen.utils.context import Contextful
+from decuen.utils.function_property import FunctionProperty
 
 
 @dataclass
 class AgentSettings:
-    """Basic common hyperparameter settings for all agents."""
+    """Basic common hyperparameter settings for all agents.
+
+    Validation of states and actions against their spaces is disabled by default to keep it off the hot path. If the
+    maximum number of steps in an episode is known, the trajectory buffer is preallocated to that size. Learning only
+    actually happens on every `update_every` call to learn and once memory holds at least `min_transitions` transitions.
+    Experience can be stored in memory by a background thread so that storing long trajectories does not stall steps.
+    """
+
+    validate: bool = False
+    max_episode_steps: Optional[int] = None
+    update_every: int = 1
+    min_transitions: int = 0
+    background_storage: bool = False
+
+
+def _skip_check(_value: Any) -> None:
+    """Perform no validation."""
+
+
+def _to_tensor(array: np.ndarray, copy: bool = True) -> Tensor:
+    """Convert an array from an environment into a single-precision tensor.
+
+    Arrays are copied at most once, and not at all if they are already contiguous and single-precision and no copy is
+    requested; arrays with negative strides, e.g. flipped images, are always copied since tensors cannot have them.
+    States that are kept around by the agent must be copied since environments are free to reuse their arrays.
+    """
+    if copy:
+        return from_numpy(np.array(array, dtype=np.float32))
+    return from_numpy(np.ascontiguousarray(array, dtype=np.float32))
 
 
 class Agent(Contextful):
@@ -33,12 +68,26 @@ class Agent(Contextful):
     actor: Actor
     critic: Critic
 
-    # Current state of the agent
-    _state: Optional[State]
-    # Action taken at that state
-    _action: Optional[State]
-    # Current agent trajectory
-    _trajectory: List[Transition]
+    # Current state of the agent in each environment
+    _states: List[Optional[State]]
+    # Action taken at that state in each environment
+    _actions: List[Optional[Action]]
+    # Current agent trajectory in each environment, reused across episodes with only the first slots of each being valid
+    # as indicated by the corresponding trajectory length
+    _trajectories: List[List[Optional[Transition]]]
+    _trajectory_lengths: List[int]
+    # Number of calls to learn since this agent last actually learned
+    _learn_calls: int
+    # Pending stores of experience into memory, which are done synchronously if background storage is disabled
+    _storage: Optional['queue.Queue[Optional[Tuple[Callable[[Any], None], Any]]]']
+    _storage_worker: Optional[threading.Thread]
+    # First error raised while storing in the background, which is raised again by the next call to learn
+    _storage_error: Optional[BaseException]
+    # Validators of states and actions, which do nothing if validation is disabled
+    _check_state: FunctionProperty[Callable[[np.ndarray], None]]
+    _check_action: FunctionProperty[Callable[[np.ndarray], None]]
+    _check_states: FunctionProperty[Callable[[np.ndarray], None]]
+    _check_actions: FunctionProperty[Callable[[np.ndarray], None]]
 
     def __init__(self, memory: Memory, actor: Actor, critic: Critic, settings: AgentSettings) -> None:
         """Initialize a generic agent."""
@@ -48,15 +97,40 @@ class Agent(Contextful):
         self.actor = actor
         self.critic = critic
 
-        self._state = None
-        self._action = None
-        self._trajectory = []
+        self._states = []
+        self._actions = []
+        self._trajectories = []
+        self._trajectory_lengths = []
+        self._resize(1)
+        self._learn_calls = 0
+
+        self._storage = None
+        self._storage_worker = None
+        self._storage_error = None
+        if settings.background_storage:
+            self._storage = queue.Queue()
+            self._storage_worker = threading.Thread(target=self._store_pending, daemon=True)
+            self._storage_worker.start()
+
+        if settings.validate:
+            self._check_state = partial(check_state, self.state_space)
+            self._check_action = partial(check_action, self.action_space)
+            self._check_states = partial(check_states, self.state_space)
+            self._check_actions = partial(check_actions, self.action_space)
+        else:
+            self._check_state = _skip_check
+            self._check_action = _skip_check
+            self._check_states = _skip_check
+            self._check_actions = _skip_check
 
         self.actor.critic = critic
 
     def init(self, state: np.ndarray) -> np.ndarray:
         """Initialize an agent at the start of a new episode."""
-        return self._step(tensor(state.astype(np.float32)), None, None).numpy()
+        self._check_state(state)
+        action = self._step(_to_tensor(state), None, None).numpy()
+        self._check_action(action)
+        return action
 
     def step(self, state: np.ndarray, reward: float, terminal: bool) -> np.ndarray:
         """Step based on a new state, a terminal state signal, and a reward signal.
@@ -65,48 +139,200 @@ class Agent(Contextful):
         was called. The reward signal corresponds to the transition that caused the migration to this state and the
         terminal signal corresponds to the currently inputted state.
         """
-        return self._step(tensor(state.astype(np.float32)), reward, terminal).numpy()
+        self._check_state(state)
+        action = self._step(_to_tensor(state), reward, terminal).numpy()
+        self._check_action(action)
+        return action
+
+    def batch_init(self, states: np.ndarray) -> np.ndarray:
+        """Initialize an agent at the start of new episodes in a batch of environments stepped in lockstep.
+
+        The number of environments is taken from the leading dimension of the states and is fixed until the next call.
+        """
+        self._resize(len(states))
+        self._check_states(states)
+        batch = _to_tensor(states)
+        actions = self._act_batch(batch)
+        for env, (state, action) in enumerate(zip(batch, actions)):
+            self._record(env, state, action, None, None)
+        actions = actions.numpy()
+        self._check_actions(actions)
+        return actions
+
+    def batch_step(self, states: np.ndarray, rewards: np.ndarray, terminals: np.ndarray,
+                   autoreset: bool = False) -> np.ndarray:
+        """Step based on new states, terminal state signals, and reward signals from a batch of environments.
+
+        Behaves like `step` for every environment but generates the actions for all environments in a single batched
+        pass of the actor; only the bookkeeping of transitions is done per environment. If the environments reset
+        themselves at the end of an episode, as vectorized environments do, the state of a terminated environment is
+        instead the first state of its next episode, which is then immediately begun with the generated action.
+        """
+        self._check_states(states)
+        batch = _to_tensor(states)
+        actions = self._act_batch(batch)
+        for env, (state, action, reward, terminal) in enumerate(zip(batch, actions, rewards, terminals)):
+            self._record(env, state, action, float(reward), bool(terminal))
+            if autoreset and terminal:
+                self._record(env, state, action, None, None)
+        actions = actions.numpy()
+        self._check_actions(actions)
+        return actions
+
+    def rollout(self, envs: Any, num_steps: int) -> None:
+        """Drive a vectorized environment for a number of steps, acting in all of its environments at once.
+
+        The environment must follow the interface of gym vector environments, e.g. `gym.vector.AsyncVectorEnv`, whose
+        environments step in parallel worker processes while this agent generates the next batch of actions in a single
+        pass. Experience is stored in memory as usual but this agent does not learn during the rollout.
+        """
+        actions = self.batch_init(envs.reset())
+        for _ in range(num_steps):
+            states, rewards, terminals, _ = envs.step(actions)
+            actions = self.batch_step(states, rewards, terminals, autoreset=True)
 
     def _step(self, state: State, reward: Optional[float], terminal: Optional[bool]) -> Action:
-        action = self._act(state).squeeze(0)
+        action = self._act(state)
+        self._record(0, state, action, reward, terminal)
+        return action
+
+    def _record(self, env: int, state: State, action: Action,
+                reward: Optional[float], terminal: Optional[bool]) -> None:
+        """Record that an action was taken in a state of an environment, storing the completed transition if any."""
+        previous_state = self._states[env]
+        previous_action = self._actions[env]
 
         # If we have no history in this episode, we still don't have anything to store
-        if self._state is None or self._action is None or reward is None or terminal is None:
-            self._state = state
-            self._action = action
-            return action
+        if previous_state is None or previous_action is None or reward is None or terminal is None:
+            self._states[env] = state
+            self._actions[env] = action
+            return
 
-        # Generate the transition and append it to the trajectory
-        transition = Transition(state=self._state, action=self._action,
-                                new_state=state, reward=reward, terminal=terminal)
-        self._trajectory.append(transition)
+        # Generate the transition and write it into the next slot of the trajectory, growing it only if needed
+        transition = Transition(previous_state, previous_action, state, reward, terminal)
+        trajectory = self._trajectories[env]
+        length = self._trajectory_lengths[env]
+        if length == len(trajectory):
+            trajectory.append(transition)
+        else:
+            trajectory[length] = transition
+        length += 1
 
         # Store the transition in memory and either reset the state of this agent while storing the trajectory
         # if we reached the end of the episode or just continue normally otherwise
-        self.memory.store_transition(transition)
+        self._store(self.memory.store_transition, transition)
         if terminal:
-            self.memory.store_trajectory(self._trajectory)
-            self._state = None
-            self._action = None
-            self._trajectory = []
+            self._store(self.memory.store_trajectory, trajectory[:length])
+            self._states[env] = None
+            self._actions[env] = None
+            self._trajectory_lengths[env] = 0
         else:
-            self._state = state
-            self._action = action
+            self._states[env] = state
+            self._actions[env] = action
+            self._trajectory_lengths[env] = length
 
-        return action
+    def _store(self, store: Callable[[Any], None], experience: Any) -> None:
+        """Store experience into memory with the given store, in the background if background storage is enabled."""
+        if self._storage is None:
+            store(experience)
+        else:
+            self._storage.put((store, experience))
+
+    def _store_pending(self) -> None:
+        """Store pending experience into memory in order, until this agent is closed.
+
+        Errors are recorded rather than raised so that pending experience is still marked done, and any experience
+        pending after an error is dropped until the error is raised by learn.
+        """
+        while True:
+            pending = self._storage.get()
+            if pending is None:
+                self._storage.task_done()
+                return
+
+            store, experience = pending
+            try:
+                if self._storage_error is None:
+                    store(experience)
+            except Exception as error:  # pylint: disable=broad-except
+                self._storage_error = error
+            finally:
+                self._storage.task_done()
+
+    def close(self) -> None:
+        """Stop storing experience in the background once all pending experience has been stored.
+
+        Any error raised while storing the pending experience is raised. Experience is stored synchronously afterwards.
+        """
+        if self._storage is None or self._storage_worker is None:
+            return
+        self._storage.put(None)
+        self._storage_worker.join()
+        self._storage = None
+        self._storage_worker = None
+
+        error, self._storage_error = self._storage_error, None
+        if error is not None:
+            raise error
+
+    def _resize(self, num_envs: int) -> None:
+        """Reset the per-environment state of this agent for the given number of environments."""
+        self._states = [None] * num_envs
+        self._actions = [None] * num_envs
+        self._trajectories = [[None] * (self.settings.max_episode_steps or 0) for _ in range(num_envs)]
+        self._trajectory_lengths = [0] * num_envs
 
     def act(self, state: np.ndarray) -> np.ndarray:
         """Generate an action to perform based on a state."""
-        return self._act(tensor(state.astype(np.float32))).numpy()
+        self._check_state(state)
+        action = self._act(_to_tensor(state, copy=False)).numpy()
+        self._check_action(action)
+        return action
+
+    def batch_act(self, states: np.ndarray) -> np.ndarray:
+        """Generate actions to perform based on a batch of states, e.g. from several environments, in a single pass."""
+        self._check_states(states)
+        actions = self._act_batch(_to_tensor(states, copy=False)).numpy()
+        self._check_actions(actions)
+        return actions
 
     def _act(self, state: State) -> Action:
         """Act internally based on a state.
 
         Override this instead of `act` in order to preserve compatibility layers.
         """
-        return self.actor.act(state).sample()
+        return self.actor.act_single(state)
+
+    def _act_batch(self, states: State) -> Action:
+        """Act internally based on a batch of states.
+
+        Override this instead of `batch_init` or `batch_step` in order to preserve compatibility layers.
+        """
+        return self.actor.act_batch(states)
 
     def learn(self) -> None:
-        """Learn or improve this agent from memory."""
+        """Learn or improve this agent from memory.
+
+        Calls in between every `update_every` calls and calls before enough transitions are in memory do nothing, which
+        allows calling this on every step while amortizing the cost of learning over several steps. Any experience still
+        pending storage in the background is stored before learning, and any error raised while storing it is raised.
+        """
+        if self._storage is not None:
+            self._storage.join()
+            error, self._storage_error = self._storage_error, None
+            if error is not None:
+                raise error
+
+        self._learn_calls += 1
+        if self._learn_calls < self.settings.update_every or len(self.memory) < self.settings.min_transitions:
+            return
+        self._learn_calls = 0
+        self._learn()
+
+    def _learn(self) -> None:
+        """Learn internally from memory.
+
+        Override this instead of `learn` in order to preserve the update frequency.
+        """
         self.actor.learn(self.memory.replay_trajectories())
         self.critic.learn(self.memory.replay_transitions())
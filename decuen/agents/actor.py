@@ -19,3 +19,10 @@ class ActorAgent(Agent):
     def __init__(self, memory: Memory, actor: Actor, settings: ActorAgentSettings) -> None:
         """Initialize a generic actor agent."""
         super().__init__(memory, actor, MonteCarloCritic(settings), settings)
+
+    def _learn(self) -> None:
+        """Learn internally from memory.
+
+        Only trajectories are replayed since the Monte Carlo critic has nothing to learn from transitions.
+        """
+        self.actor.learn(self.memory.replay_trajectories())
@@ -21,3 +21,10 @@ class CriticAgent(Agent):
                  settings: CriticAgentSettings) -> None:
         """Initialize a generic critic agent."""
         super().__init__(memory, StrategyActor(strategy, settings), critic, settings)
+
+    def _learn(self) -> None:
+        """Learn internally from memory.
+
+        Only transitions are replayed since the strategy-based actor has nothing to learn from trajectories.
+        """
+        self.critic.learn(self.memory.replay_transitions())
@@ -1,10 +1,19 @@
-"""Critic interfaces and implementations for generating and learning critical analysis of actions and states."""
+"""Critic interfaces and implementations for generating and learning critical analysis of actions and states.
+
+Concrete critics are only imported once first accessed so that importing this package does not pull in the
+dependencies of every critic, e.g. Numba for Monte Carlo critics.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any, Dict
 
 from decuen.critics._critic import Critic, CriticSettings
-from decuen.critics.montecarlo import (MonteCarloCritic,
-                                       MonteCarloCriticSettings)
-from decuen.critics.q import QValueCritic, QValueCriticSettings
-from decuen.critics.v import StateValueCritic, StateValueCriticSettings
+
+if TYPE_CHECKING:
+    from decuen.critics.montecarlo import (MonteCarloCritic,
+                                           MonteCarloCriticSettings)
+    from decuen.critics.q import QValueCritic, QValueCriticSettings
+    from decuen.critics.v import StateValueCritic, StateValueCriticSettings
 
 __all__ = [
     "Critic", "CriticSettings",
@@ -12,3 +21,21 @@ __all__ = [
     "StateValueCritic", "StateValueCriticSettings",
     "MonteCarloCritic", "MonteCarloCriticSettings",
 ]
+
+_LAZY_MODULES: Dict[str, str] = {
+    "QValueCritic": "decuen.critics.q",
+    "QValueCriticSettings": "decuen.critics.q",
+    "StateValueCritic": "decuen.critics.v",
+    "StateValueCriticSettings": "decuen.critics.v",
+    "MonteCarloCritic": "decuen.critics.montecarlo",
+    "MonteCarloCriticSettings": "decuen.critics.montecarlo",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import concrete critics lazily on first access."""
+    if name not in _LAZY_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_MODULES[name]), name)
+    globals()[name] = value
+    return value
@@ -2,9 +2,10 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import MutableSequence, Union
+from typing import Union
 
-from decuen.structs import Tensor, Trajectory, Transition
+from decuen.structs import (BatchedTransitions, Tensor, Transition,
+                            batch_transitions)
 from decuen.utils.context import Contextful
 
 
@@ -41,16 +42,20 @@ class Critic(ABC, Contextful):
     # TODO: support learning from trajectories
     # XXX: possibly return loss or some other metric?
     @abstractmethod
-    def learn(self, transitions: MutableSequence[Transition]) -> None:
-        """Update internal critic representation based on past transitions."""
+    def learn(self, batch: BatchedTransitions) -> None:
+        """Update internal critic representation based on a batch of past transitions."""
         ...
 
-    def advantage(self, trajectory: Union[Transition, Trajectory]) -> Tensor:
-        """Estimate the advantage of every transition in a trajectory."""
+    def advantage(self, trajectory: Union[Transition, BatchedTransitions]) -> Tensor:
+        """Estimate the advantage of every transition in a batched trajectory.
+
+        Advantages are returned directly as a one-dimensional tensor with one entry per transition so that they can be
+        used by actors without any conversion or copying.
+        """
         if isinstance(trajectory, Transition):
-            return self._advantage([trajectory])
+            return self._advantage(batch_transitions([trajectory]))
         return self._advantage(trajectory)
 
     @abstractmethod
-    def _advantage(self, trajectory: Trajectory) -> Tensor:
+    def _advantage(self, trajectory: BatchedTransitions) -> Tensor:
         ...
@@ -4,13 +4,12 @@ Simply estimates the state values based on a Monte Carlo estimate of the expecte
 """
 
 from dataclasses import dataclass
-from typing import MutableSequence
 
-from torch import arange
+from torch import from_numpy  # pylint: disable=no-name-in-module
 
 from decuen.critics._critic import Critic, CriticSettings
-from decuen.structs import (Tensor, Trajectory, Transition, batch_transitions,
-                            tensor)
+from decuen.structs import BatchedTransitions, Tensor
+from decuen.utils.discounting import discounted_returns
 
 
 @dataclass
@@ -25,11 +24,9 @@ class MonteCarloCritic(Critic):
         """Initialize a Monte Carlo critic."""
         super().__init__(settings)
 
-    def learn(self, transitions: MutableSequence[Transition]) -> None:
+    def learn(self, batch: BatchedTransitions) -> None:
         """Do nothing. Monte Carlo critic does not learn."""
 
-    def _advantage(self, trajectory: Trajectory) -> Tensor:
-        batch = batch_transitions(trajectory)
-        discounted_rewards = tensor([self.settings.discount_factor]).pow(arange(batch.rewards.size()[0]))
-        advantages = discounted_rewards.flip(0).cumsum(0).flip(0)  # Reverse cumulative sum (causality)
-        return advantages
+    def _advantage(self, trajectory: BatchedTransitions) -> Tensor:
+        return from_numpy(discounted_returns(trajectory.rewards.cpu().numpy(), trajectory.terminals.cpu().numpy(),
+                                             self.settings.discount_factor))
@@ -12,28 +12,39 @@ Implements both deep Q-learning [1, 2] and double deep Q-learning [3] algorithms
 
 import copy
 from dataclasses import dataclass
-from typing import MutableSequence
+from typing import Callable, Optional
 
 from gym.spaces import Discrete  # type: ignore
-from torch import from_numpy, zeros  # pylint: disable=no-name-in-module
+from torch import autocast, cat, dtype, from_numpy, no_grad, zeros_like  # pylint: disable=no-name-in-module
+from torch.cuda.amp import GradScaler
 from torch.nn import Module
 from torch.optim import Optimizer  # type: ignore
 
 from decuen.critics._critic import Critic, CriticSettings
-from decuen.structs import (Action, State, Tensor, Trajectory, Transition,
-                            batch_transitions)
+from decuen.structs import Action, BatchedTransitions, Device, State, Tensor
+from decuen.utils.compilation import compile_if_available
+from decuen.utils.function_property import FunctionProperty
 from decuen.utils.module_construction import finalize_module
 
 
 @dataclass
 class QValueCriticSettings(CriticSettings):
-    """Settings for Q-network critics."""
+    """Settings for Q-network critics.
+
+    Criticism outside of learning, e.g. for action selection, can run at a reduced `inference_dtype` under autocast,
+    such as `torch.bfloat16`. Learning can separately be done with automatic mixed precision, in which case losses are
+    scaled to keep half-precision gradients from underflowing. Both the online and target networks, as well as the loss
+    computation fusing the target estimation with the loss itself, can be compiled.
+    """
 
     target_update: int
     double: bool
     clipped: bool
     optimizer: Optimizer
     loss: Module
+    inference_dtype: Optional[dtype] = None
+    mixed_precision: bool = False
+    compiled: bool = False
 
 
 class QValueCritic(Critic):
@@ -46,6 +57,10 @@ class QValueCritic(Critic):
     settings: QValueCriticSettings
     network: Module
     _target_network: Module
+    # Scaler of losses for mixed precision learning, which leaves losses untouched if mixed precision is disabled
+    _scaler: GradScaler
+    # Computation of the loss on a batch of transitions, possibly compiled
+    _loss: FunctionProperty[Callable[[State, Action, State, Tensor, Tensor], Tensor]]
 
     def __init__(self, model: Module, settings: QValueCriticSettings) -> None:
         """Initialize this generic actor critic interface."""
@@ -58,45 +73,94 @@ class QValueCritic(Critic):
         final_layer, self.network = finalize_module(model, from_numpy(self.state_space.sample()), self.action_space.n)
         self._target_network = copy.deepcopy(self.network)
         self._target_network.eval()
-
+        self._loss = self._compute_loss
+        if self.settings.compiled:
+            self.network = compile_if_available(self.network)
+            self._target_network = compile_if_available(self._target_network)
+            self._loss = compile_if_available(self._compute_loss)
         self.settings.optimizer.add_param_group({"params": final_layer.parameters()})
+        self._scaler = GradScaler(enabled=settings.mixed_precision)
 
-    def learn(self, transitions: MutableSequence[Transition]) -> None:
-        """Update internal critic representation based on past transitions."""
+    def learn(self, batch: BatchedTransitions) -> None:
+        """Update internal critic representation based on a batch of past transitions."""
         self._learn_step += 1
-        if not transitions:
+        if not batch:
             return
+        batch = batch.to(self.device)
 
-        batch = batch_transitions(transitions)
+        loss = self._loss(batch.states, batch.actions, batch.new_states, batch.rewards, batch.terminals)
 
-        values = self.network(batch.states).gather(1, batch.actions.unsqueeze(1))
-        new_states_not_terminal = batch.new_states[~batch.terminals]
-
-        next_values = zeros(len(transitions))
-        if self.settings.double:
-            chosen_actions = self._target_network(new_states_not_terminal).argmax(1, keepdims=True)
-            next_values[~batch.terminals] = (self.network(new_states_not_terminal)
-                                             .gather(1, chosen_actions).squeeze(1).detach())
-        else:
-            next_values[~batch.terminals] = self._target_network(new_states_not_terminal).max(1)[0].detach()
-        target_values = (batch.rewards + (self.settings.discount_factor * next_values)).unsqueeze(1)
-
-        loss = self.settings.loss(values, target_values)
         self.settings.optimizer.zero_grad()
-        loss.backward()
+        self._scaler.scale(loss).backward()
         if self.settings.clipped:
+            # Gradients must be unscaled before being clipped so that the clipping bounds are in the true gradient scale
+            self._scaler.unscale_(self.settings.optimizer)
             for param in self.network.parameters():
                 if param.grad is not None:
                     param.grad.data.clamp_(-1, 1)
-        self.settings.optimizer.step()
+        self._scaler.step(self.settings.optimizer)
+        self._scaler.update()
 
         if self._learn_step % self.settings.target_update == 0:
-            self._target_network.load_state_dict(self.network.state_dict())
+            self._synchronize_target()
+
+    def _compute_loss(self, states: State, actions: Action, new_states: State, rewards: Tensor,
+                      terminals: Tensor) -> Tensor:
+        """Compute the temporal-difference loss of the online network on a batch of transitions."""
+        with autocast(self.device.type, enabled=self.settings.mixed_precision):
+            new_states_not_terminal = new_states[~terminals]
+
+            next_values = zeros_like(rewards)
+            if self.settings.double:
+                # Evaluate the online network on both states and new states in a single forward pass, the online network
+                # then chooses the next actions and the target network evaluates them
+                online_values = self.network(cat((states, new_states_not_terminal)))
+                values = online_values[:len(states)].gather(1, actions.unsqueeze(1))
+                chosen_actions = online_values[len(states):].detach().argmax(1, keepdims=True)
+                next_values[~terminals] = (self._target_network(new_states_not_terminal)
+                                           .gather(1, chosen_actions).squeeze(1).detach().float())
+            else:
+                values = self.network(states).gather(1, actions.unsqueeze(1))
+                next_values[~terminals] = self._target_network(new_states_not_terminal).max(1)[0].detach().float()
+            target_values = (rewards + (self.settings.discount_factor * next_values)).unsqueeze(1)
+
+            return self.settings.loss(values, target_values)
+
+    @no_grad()
+    def _synchronize_target(self) -> None:
+        """Copy the online network into the target network in place, without materializing a state dictionary.
+
+        Corresponding tensors are paired on every call since moving either network to a device replaces its tensors.
+        """
+        for target, online in zip(self._target_network.parameters(), self.network.parameters()):
+            target.copy_(online, non_blocking=True)
+        for target, online in zip(self._target_network.buffers(), self.network.buffers()):
+            target.copy_(online, non_blocking=True)
+
+    @property
+    def device(self) -> Device:
+        """Get the device the Q-network lives on."""
+        return next(self.network.parameters()).device
 
     def crit(self, state: State, action: Action) -> Tensor:
-        """Estimate the quality of taking an action or tensor of actions in a state."""
-        return self.network(state).detach()[action]
-
-    def _advantage(self, trajectory: Trajectory) -> Tensor:
-        batch = batch_transitions(trajectory)
-        return self.network(batch.states).detach().gather(1, batch.actions.unsqueeze(1))
+        """Estimate the quality of taking an action or tensor of actions in a state or batch of states.
+
+        All actions are criticised in a single forward pass; for a batch of states every action is criticised in every
+        state of the batch.
+        """
+        if self.settings.inference_dtype is None:
+            return self.network(state).detach()[..., action]
+        with autocast(self.device.type, dtype=self.settings.inference_dtype):
+            values = self.network(state)
+        return values.detach()[..., action].float()
+
+    def crit_batch(self, states: State, actions: Action) -> Tensor:
+        """Estimate the quality of taking each action of a batch in its corresponding state of a batch of states.
+
+        Unlike `crit`, which criticises several actions in the same state, this pairs states and actions up row-wise and
+        evaluates the whole batch in a single forward pass.
+        """
+        return self.network(states).detach().gather(1, actions.unsqueeze(1)).squeeze(1)
+
+    def _advantage(self, trajectory: BatchedTransitions) -> Tensor:
+        return self.crit_batch(trajectory.states, trajectory.actions)
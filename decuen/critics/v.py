@@ -1,15 +1,20 @@
-"""Deep state value action critics."""
+"""Deep state value action critics.
+
+Advantages are estimated with generalized advantage estimation [1].
+
+[1] Schulman, John; et al. (2015). High-Dimensional Continuous Control Using Generalized Advantage Estimation
+    https://arxiv.org/pdf/1506.02438.pdf
+"""
 
 from dataclasses import dataclass
-from typing import MutableSequence
 
 from torch import from_numpy, zeros_like  # pylint: disable=no-name-in-module
 from torch.nn import Module
 from torch.optim import Optimizer  # type: ignore
 
 from decuen.critics._critic import Critic, CriticSettings
-from decuen.structs import (State, Tensor, Trajectory, Transition,
-                            batch_transitions)
+from decuen.structs import BatchedTransitions, State, Tensor
+from decuen.utils.discounting import generalized_advantages
 from decuen.utils.module_construction import finalize_module
 
 
@@ -19,6 +24,7 @@ class StateValueCriticSettings(CriticSettings):
 
     optimizer: Optimizer
     loss: Module
+    trace_decay: float = 0.95
 
 
 class StateValueCritic(Critic):
@@ -35,13 +41,11 @@ class StateValueCritic(Critic):
 
         self.settings.optimizer.add_param_group({"params": final_layer.parameters()})
 
-    def learn(self, transitions: MutableSequence[Transition]) -> None:
-        """Update internal critic representation based on past transitions."""
+    def learn(self, batch: BatchedTransitions) -> None:
+        """Update internal critic representation based on a batch of past transitions."""
         self._learn_step += 1
-        if not transitions:
+        if not batch:
             return
-
-        batch = batch_transitions(transitions)
         new_states_not_terminal = batch.new_states[~batch.terminals]
 
         future_values = zeros_like(batch.rewards)
@@ -59,6 +63,9 @@ class StateValueCritic(Critic):
         """Estimate the quality of a state or tensor of states."""
         return self.network(state).detach().squeeze(1)
 
-    def _advantage(self, trajectory: Trajectory) -> Tensor:
-        batch = batch_transitions(trajectory)
-        return self.network(batch.states).detach()
+    def _advantage(self, trajectory: BatchedTransitions) -> Tensor:
+        # Temporal-difference errors are computed for the whole trajectory at once, only the recurrence is sequential
+        future_values = self.crit(trajectory.new_states) * ~trajectory.terminals
+        deltas = trajectory.rewards + self.settings.discount_factor * future_values - self.crit(trajectory.states)
+        return from_numpy(generalized_advantages(deltas.cpu().numpy(), trajectory.terminals.cpu().numpy(),
+                                                 self.settings.discount_factor, self.settings.trace_decay))
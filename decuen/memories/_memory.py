@@ -3,7 +3,8 @@
 from abc import ABC, abstractmethod
 from typing import MutableSequence, Optional
 
-from decuen.structs import Trajectory, Transition
+from decuen.structs import (BatchedTransitions, Trajectory, Transition,
+                            TransitionBuffer, batch_transitions)
 
 
 class Memory(ABC):
@@ -17,15 +18,15 @@ class Memory(ABC):
     """
 
     transition: Optional[Transition]
-    trajectory: Optional[Trajectory]
+    trajectory: Optional[BatchedTransitions]
     transition_replay_num: int
     trajectory_replay_num: int
 
-    _transition_buffer: MutableSequence[Transition]
-    _trajectory_buffer: MutableSequence[Trajectory]
+    _transition_buffer: TransitionBuffer
+    _trajectory_buffer: MutableSequence[BatchedTransitions]
 
     def __init__(self,
-                 transition_buffer: MutableSequence[Transition], trajectory_buffer: MutableSequence[Trajectory],
+                 transition_buffer: TransitionBuffer, trajectory_buffer: MutableSequence[BatchedTransitions],
                  transition_replay_num: int = 1, trajectory_replay_num: int = 1) -> None:
         """Initialize a generic memory mechanism."""
         self.transition = None
@@ -35,30 +36,37 @@ class Memory(ABC):
         self._transition_buffer = transition_buffer
         self._trajectory_buffer = trajectory_buffer
 
+    def __len__(self) -> int:
+        """Get the number of transitions available for replay in this memory."""
+        return len(self._transition_buffer)
+
     @abstractmethod
     def store_transition(self, transition: Transition) -> None:
         """Store a transition in this memory mechanism's buffer with any needed associated information."""
         self.transition = transition
 
-    def replay_transitions(self, num: Optional[int] = None) -> MutableSequence[Transition]:
-        """Replay experiences from our memory buffer based on some mechanism."""
+    def replay_transitions(self, num: Optional[int] = None) -> BatchedTransitions:
+        """Replay a batch of experiences from our memory buffer based on some mechanism."""
         return self._replay_transitions(min(len(self._transition_buffer), num or self.transition_replay_num))
 
     @abstractmethod
-    def _replay_transitions(self, num: int) -> MutableSequence[Transition]:
+    def _replay_transitions(self, num: int) -> BatchedTransitions:
         ...
 
     @abstractmethod
     def store_trajectory(self, trajectory: Trajectory) -> None:
-        """Store a trajectory in this memory mechanism's buffer consisting of a sequence of transitions."""
-        self.trajectory = trajectory
+        """Store a trajectory in this memory mechanism's buffer consisting of a sequence of transitions.
+
+        Trajectories are batched once when stored so that replaying them never requires batching them again.
+        """
+        self.trajectory = batch_transitions(trajectory)
 
-    def replay_trajectories(self, num: Optional[int] = None) -> MutableSequence[Trajectory]:
-        """Replay trajectories from our memory buffer based on some mechanism."""
+    def replay_trajectories(self, num: Optional[int] = None) -> MutableSequence[BatchedTransitions]:
+        """Replay batched trajectories from our memory buffer based on some mechanism."""
         return self._replay_trajectories(min(len(self._trajectory_buffer), num or self.trajectory_replay_num))
 
     @abstractmethod
-    def _replay_trajectories(self, num: int) -> MutableSequence[Trajectory]:
+    def _replay_trajectories(self, num: int) -> MutableSequence[BatchedTransitions]:
         ...
 
     def clear(self) -> None:
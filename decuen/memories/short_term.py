@@ -6,7 +6,8 @@ Simulates the capacity for on-policy training.
 from typing import List
 
 from decuen.memories._memory import Memory
-from decuen.structs import Trajectory, Transition
+from decuen.structs import (BatchedTransitions, Trajectory, Transition,
+                            TransitionBuffer)
 
 
 class ShortTermMemory(Memory):
@@ -17,20 +18,20 @@ class ShortTermMemory(Memory):
 
     def __init__(self) -> None:
         """Initialize a short-term memory mechanism."""
-        super().__init__([], [])
+        super().__init__(TransitionBuffer(1), [])
 
-    # pylint: disable=useless-super-delegation
     def store_transition(self, transition: Transition) -> None:
-        """Store nothing in long-term transition memory."""
+        """Store only the most recent transition, forgetting the one before it."""
         super().store_transition(transition)
+        self._transition_buffer.insert(transition)
 
-    def _replay_transitions(self, num: int) -> List[Transition]:
-        return [self.transition] if self.transition else []
+    def _replay_transitions(self, num: int) -> BatchedTransitions:
+        return self._transition_buffer.batch()
 
     # pylint: disable=useless-super-delegation
     def store_trajectory(self, trajectory: Trajectory) -> None:
         """Store nothing in long-term trajectory memory."""
         super().store_trajectory(trajectory)
 
-    def _replay_trajectories(self, num: int = None) -> List[Trajectory]:
-        return [self.trajectory] if self.trajectory else []
+    def _replay_trajectories(self, num: int = None) -> List[BatchedTransitions]:
+        return [self.trajectory] if self.trajectory is not None else []
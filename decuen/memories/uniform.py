@@ -3,8 +3,11 @@
 import random
 from typing import List, Optional
 
+from torch import dtype, randint  # pylint: disable=no-name-in-module
+
 from decuen.memories._memory import Memory
-from decuen.structs import Trajectory, Transition
+from decuen.structs import (BatchedTransitions, Device, Trajectory,
+                            Transition, TransitionBuffer)
 
 
 class UniformMemory(Memory):
@@ -14,28 +17,36 @@ class UniformMemory(Memory):
     _trajectories_cap: Optional[int]
 
     def __init__(self, transition_replay_num: int = 1, trajectory_replay_num: int = 1,
-                 transitions_cap: Optional[int] = None, trajectories_cap: Optional[int] = None) -> None:
-        """Initialize a uniform memory mechanism."""
-        super().__init__([], [], transition_replay_num, trajectory_replay_num)
+                 transitions_cap: Optional[int] = None, trajectories_cap: Optional[int] = None,
+                 state_dtype: Optional[dtype] = None, device: Optional[Device] = None) -> None:
+        """Initialize a uniform memory mechanism.
+
+        Replayed transitions can store their states at a reduced precision given by `state_dtype` to save memory, and
+        can be kept on the `device` they are learned on, e.g. a GPU, so that replaying them needs no transfer.
+        """
+        super().__init__(TransitionBuffer(transitions_cap, state_dtype, device), [], transition_replay_num,
+                         trajectory_replay_num)
         self._transitions_cap = transitions_cap
         self._trajectories_cap = trajectories_cap
 
     def store_transition(self, transition: Transition) -> None:
         """Store a transition in this memory mechanism's buffer with any needed associated information."""
         self.transition = transition
-        if self._transitions_cap is not None and len(self._transition_buffer) == self._transitions_cap:
-            self._transition_buffer.pop(0)
-        self._transition_buffer.append(transition)
+        self._transition_buffer.insert(transition)
 
-    def _replay_transitions(self, num: int) -> List[Transition]:
-        return random.choices(self._transition_buffer, k=num)
+    def _replay_transitions(self, num: int) -> BatchedTransitions:
+        # Sampling indices from an empty buffer is undefined, but it has no transitions to gather anyway
+        if not self._transition_buffer:
+            return self._transition_buffer.batch()
+        return self._transition_buffer.batch(randint(len(self._transition_buffer), (num,),
+                                                     device=self._transition_buffer.device))
 
     def store_trajectory(self, trajectory: Trajectory) -> None:
         """Store a trajectory in this memory mechanism's buffer consisting of a sequence of transitions."""
-        self.trajectory = trajectory
+        super().store_trajectory(trajectory)
         if self._trajectories_cap is not None and len(self._trajectory_buffer) == self._trajectories_cap:
             self._trajectory_buffer.pop(0)
-        self._trajectory_buffer.append(trajectory)
+        self._trajectory_buffer.append(self.trajectory)
 
-    def _replay_trajectories(self, num: int) -> List[Trajectory]:
+    def _replay_trajectories(self, num: int) -> List[BatchedTransitions]:
         return random.choices(self._trajectory_buffer, k=num)
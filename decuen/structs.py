@@ -4,8 +4,9 @@ These structures should only be used internally within the framework and their A
 """
 
 from dataclasses import dataclass
-from typing import Optional, Sequence
+from typing import NamedTuple, Optional, Sequence
 
+import numpy as np  # type: ignore
 import torch
 
 from decuen.dists import Distribution
@@ -13,6 +14,7 @@ from decuen.dists import Distribution
 State = torch.Tensor
 Action = torch.Tensor
 Tensor = torch.Tensor
+Device = torch.device
 
 
 def tensor(*args, **kwargs) -> torch.Tensor:  # noqa
@@ -24,7 +26,10 @@ tensor.__doc__ = torch.tensor.__doc__
 
 @dataclass
 class BatchedTransitions:
-    """Represents a batch of transitions packaged in the format expected by our training procedures."""
+    """Represents a batch of transitions packaged in the format expected by our training procedures.
+
+    Rewards are always single-precision floats and terminals are always booleans to keep batches compact.
+    """
 
     states: torch.Tensor
     actions: torch.Tensor
@@ -32,10 +37,28 @@ class BatchedTransitions:
     rewards: torch.Tensor
     terminals: torch.Tensor
 
+    def __len__(self) -> int:
+        """Get the number of transitions in this batch."""
+        return self.rewards.size()[0]
 
-@dataclass
-class Transition:
-    """Simple data structure representing a transition from one state to another with associated information."""
+    def to(self, device: Device, non_blocking: bool = True) -> 'BatchedTransitions':  # pylint: disable=invalid-name
+        """Move every tensor in this batch to the given device.
+
+        Transfers are asynchronous by default, which overlaps them with other work when the batch is in pinned memory.
+        """
+        return BatchedTransitions(self.states.to(device, non_blocking=non_blocking),
+                                  self.actions.to(device, non_blocking=non_blocking),
+                                  self.new_states.to(device, non_blocking=non_blocking),
+                                  self.rewards.to(device, non_blocking=non_blocking),
+                                  self.terminals.to(device, non_blocking=non_blocking))
+
+
+class Transition(NamedTuple):
+    """Simple data structure representing a transition from one state to another with associated information.
+
+    A named tuple rather than a dataclass since one is created on every step, which keeps it free of a per-instance
+    dictionary and cheaper to construct.
+    """
 
     state: State
     action: Action
@@ -51,12 +74,187 @@ class Transition:
 Trajectory = Sequence[Transition]
 
 
+def stack(tensors: Sequence[torch.Tensor], out: Optional[torch.Tensor] = None) -> torch.Tensor:
+    """Stack a sequence of equally-sized tensors along a new leading dimension.
+
+    Allocates a single contiguous output buffer up-front and copies every tensor into its slot, avoiding both the
+    per-element overhead of `torch.stack` and any intermediate allocations. A single tensor is simply viewed as a batch
+    of one.
+
+    If a preallocated buffer with room for at least as many tensors is given then the tensors are copied into its
+    leading slots and a view of those slots is returned instead, which avoids allocating entirely when stacking
+    repeatedly.
+    """
+    if len(tensors) == 1:
+        return tensors[0].unsqueeze(0)
+
+    if out is not None:
+        out = out[:len(tensors)]
+    else:
+        out = torch.empty((len(tensors), *tensors[0].size()), dtype=tensors[0].dtype, device=tensors[0].device)
+    for i, item in enumerate(tensors):
+        out[i].copy_(item)
+    return out
+
+
+def concatenate_batches(batches: Sequence[BatchedTransitions]) -> BatchedTransitions:
+    """Concatenate a sequence of batches of transitions into a single batch.
+
+    A single batch is returned as-is since its tensors are already contiguous, avoiding a copy of every field. Otherwise
+    the batches are concatenated into pinned memory when CUDA is available so that the result, which is only needed
+    transiently for learning, can be transferred to the device asynchronously.
+    """
+    if len(batches) == 1:
+        return batches[0]
+    return BatchedTransitions(_cat([batch.states for batch in batches]),
+                              _cat([batch.actions for batch in batches]),
+                              _cat([batch.new_states for batch in batches]),
+                              _cat([batch.rewards for batch in batches]),
+                              _cat([batch.terminals for batch in batches]))
+
+
+def _cat(tensors: Sequence[torch.Tensor]) -> torch.Tensor:
+    """Concatenate tensors along their leading dimension, pinning the result if on the CPU and CUDA is available."""
+    if not torch.cuda.is_available() or tensors[0].is_cuda:
+        return torch.cat(tensors)
+    out = torch.empty((sum(len(item) for item in tensors), *tensors[0].size()[1:]), dtype=tensors[0].dtype,
+                      pin_memory=True)
+    return torch.cat(tensors, out=out)
+
+
 def batch_transitions(transitions: Sequence[Transition]) -> BatchedTransitions:
     """Batch a sequence of transitions into the format expected by our training procedures."""
-    states = torch.stack([transition.state for transition in transitions])
-    actions = torch.stack([transition.action for transition in transitions])
-    new_states = torch.stack([transition.new_state for transition in transitions])
-    rewards = tensor([transition.reward for transition in transitions])
-    terminals = tensor([transition.terminal for transition in transitions])
+    states = stack([transition.state for transition in transitions])
+    actions = stack([transition.action for transition in transitions])
+    new_states = stack([transition.new_state for transition in transitions])
+    rewards = torch.from_numpy(np.fromiter((transition.reward for transition in transitions),
+                                           dtype=np.float32, count=len(transitions)))
+    terminals = torch.from_numpy(np.fromiter((transition.terminal for transition in transitions),
+                                             dtype=np.bool_, count=len(transitions)))
 
     return BatchedTransitions(states, actions, new_states, rewards, terminals)
+
+
+class TransitionBuffer:
+    """Ring buffer of transitions stored as a structure of arrays.
+
+    Every transition field is stored in its own preallocated tensor so that transitions are written in place and batches
+    are gathered with a single indexing operation per field rather than per-transition Python work. Storage is allocated
+    on the first insertion once the shapes of states and actions are known. If no capacity is given the buffer grows
+    geometrically instead of overwriting the oldest transitions.
+
+    Floating-point states can be stored at a reduced precision, e.g. `torch.float16`, to cut the memory and bandwidth
+    used by large buffers; they are converted back to their original precision only when gathered into a batch.
+
+    Storage can also be placed directly on a device, e.g. a GPU, so that sampled batches are already resident there and
+    need no transfer when learning; transitions are then copied to the device once, when inserted. Otherwise, gathered
+    batches are pinned when CUDA is available so that they can be transferred to the device asynchronously.
+    """
+
+    capacity: Optional[int]
+    state_dtype: Optional[torch.dtype]
+    device: Optional[Device]
+    states: Optional[torch.Tensor]
+    actions: Optional[torch.Tensor]
+    new_states: Optional[torch.Tensor]
+    rewards: Optional[torch.Tensor]
+    terminals: Optional[torch.Tensor]
+
+    # Slot the next transition is written to
+    _index: int
+    # Number of transitions currently stored
+    _size: int
+    # Precision of the inserted states which gathered states are converted back to
+    _batch_state_dtype: Optional[torch.dtype]
+
+    _INITIAL_UNBOUNDED_SIZE = 1024
+
+    def __init__(self, capacity: Optional[int] = None, state_dtype: Optional[torch.dtype] = None,
+                 device: Optional[Device] = None) -> None:
+        """Initialize an empty transition buffer with optional capacity, storage precision of states, and device."""
+        if state_dtype is not None and not state_dtype.is_floating_point:
+            raise ValueError(f"storage precision of states must be a floating-point type, instead got {state_dtype}")
+        self.capacity = capacity
+        self.state_dtype = state_dtype
+        self.device = device
+        self.states = None
+        self.actions = None
+        self.new_states = None
+        self.rewards = None
+        self.terminals = None
+        self._index = 0
+        self._size = 0
+        self._batch_state_dtype = None
+
+    def __len__(self) -> int:
+        """Get the number of transitions stored in this buffer."""
+        return self._size
+
+    def insert(self, transition: Transition) -> None:
+        """Write a transition into the next slot of this buffer, overwriting the oldest transition if full."""
+        if self.states is None:
+            self._allocate(transition, self.capacity or self._INITIAL_UNBOUNDED_SIZE)
+        elif self.capacity is None and self._index == self.states.size()[0]:
+            self._grow()
+
+        index = self._index
+        self.states[index].copy_(transition.state)
+        self.actions[index].copy_(transition.action)
+        self.new_states[index].copy_(transition.new_state)
+        self.rewards[index] = transition.reward
+        self.terminals[index] = transition.terminal
+
+        self._index = index + 1 if self.capacity is None else (index + 1) % self.capacity
+        if self.capacity is None or self._size < self.capacity:
+            self._size += 1
+
+    def batch(self, indices: Optional[torch.Tensor] = None) -> BatchedTransitions:
+        """Gather the transitions at the given indices, or view all stored transitions if no indices are given."""
+        if self.states is None:
+            empty = torch.empty(0, device=self.device)
+            return BatchedTransitions(empty, empty, empty, empty, torch.empty(0, dtype=torch.bool, device=self.device))
+        if indices is None:
+            return BatchedTransitions(self.states[:self._size].to(self._batch_state_dtype), self.actions[:self._size],
+                                      self.new_states[:self._size].to(self._batch_state_dtype),
+                                      self.rewards[:self._size], self.terminals[:self._size])
+        return BatchedTransitions(self._gather(self.states, indices, self._batch_state_dtype),
+                                  self._gather(self.actions, indices),
+                                  self._gather(self.new_states, indices, self._batch_state_dtype),
+                                  self._gather(self.rewards, indices), self._gather(self.terminals, indices))
+
+    def clear(self) -> None:
+        """Forget all stored transitions while keeping the allocated storage."""
+        self._index = 0
+        self._size = 0
+
+    def _gather(self, field: torch.Tensor, indices: torch.Tensor, dtype: Optional[torch.dtype] = None) -> torch.Tensor:
+        """Gather the rows of a field at the given indices, directly into pinned memory if CUDA is available.
+
+        Every batch is gathered into freshly allocated memory, which the caching host allocator recycles only once any
+        asynchronous transfer out of it has completed.
+        """
+        dtype = dtype or field.dtype
+        if self.device is not None or not torch.cuda.is_available():
+            return field[indices].to(dtype)
+        out = torch.empty((len(indices), *field.size()[1:]), dtype=dtype, pin_memory=True)
+        if dtype == field.dtype:
+            return torch.index_select(field, 0, indices, out=out)
+        return out.copy_(field.index_select(0, indices))
+
+    def _allocate(self, transition: Transition, size: int) -> None:
+        self._batch_state_dtype = transition.state.dtype
+        state_dtype = self.state_dtype if self.state_dtype and transition.state.is_floating_point() else None
+        self.states = torch.empty((size, *transition.state.size()), dtype=state_dtype or transition.state.dtype,
+                                  device=self.device)
+        self.actions = torch.empty((size, *transition.action.size()), dtype=transition.action.dtype, device=self.device)
+        self.new_states = torch.empty((size, *transition.new_state.size()), dtype=state_dtype or transition.state.dtype,
+                                      device=self.device)
+        self.rewards = torch.empty(size, dtype=torch.float32, device=self.device)
+        self.terminals = torch.empty(size, dtype=torch.bool, device=self.device)
+
+    def _grow(self) -> None:
+        self.states = torch.cat((self.states, torch.empty_like(self.states)))
+        self.actions = torch.cat((self.actions, torch.empty_like(self.actions)))
+        self.new_states = torch.cat((self.new_states, torch.empty_like(self.new_states)))
+        self.rewards = torch.cat((self.rewards, torch.empty_like(self.rewards)))
+        self.terminals = torch.cat((self.terminals, torch.empty_like(self.terminals)))
@@ -1,9 +1,9 @@
 """Collection of simple checks and exceptions for use around the library."""
 
 import numpy as np  # type: ignore
-from gym.spaces import Space  # type: ignore
+from gym.spaces import Box, Discrete, Space  # type: ignore
 
-from decuen.structs import Transition
+from decuen.structs import BatchedTransitions, Transition
 
 
 class DecuenError(Exception):
@@ -18,12 +18,38 @@ class MalformedActionError(DecuenError):
     """Error raised when an action is found to not belong to an appropriate action space."""
 
 
+def _contains(space: Space, value: np.ndarray) -> bool:
+    """Check whether a value is part of a space.
+
+    Box spaces are checked directly against their shape and bounds, which skips the conversions done by gym on every
+    membership test; every other space falls back to its own membership test.
+    """
+    if isinstance(space, Box):
+        return value.shape == space.shape and bool((value >= space.low).all()) and bool((value <= space.high).all())
+    return value in space
+
+
+def _contains_all(space: Space, values: np.ndarray) -> bool:
+    """Check whether every value in a batch of values is part of a space.
+
+    Box and Discrete spaces are checked with a handful of vectorized predicates over the whole batch; every other space
+    falls back to checking values one by one.
+    """
+    if isinstance(space, Box):
+        return (values.shape[1:] == space.shape
+                and bool((values >= space.low).all()) and bool((values <= space.high).all()))
+    if isinstance(space, Discrete):
+        return (values.ndim == 1 and np.issubdtype(values.dtype, np.integer)
+                and bool(((values >= 0) & (values < space.n)).all()))
+    return all(_contains(space, value) for value in values)
+
+
 def check_state(state_space: Space, state: np.ndarray) -> None:
     """Check that a state is an appropriately part of a state space.
 
     Raises a `MalformedStateError` if the state is malformed, i.e not part of the state space.
     """
-    if state not in state_space:
+    if not _contains(state_space, state):
         raise MalformedStateError(f"state `{state}` is not in the agent state space `{state_space}`")
 
 
@@ -32,7 +58,7 @@ def check_action(action_space: Space, action: np.ndarray) -> None:
 
     Raises a `MalformedActionError` if the action is malformed, i.e not part of the action space.
     """
-    if action not in action_space:
+    if not _contains(action_space, action):
         raise MalformedActionError(f"action `{action}` is not in the agent state space `{action_space}`")
 
 
@@ -44,3 +70,31 @@ def check_transition(state_space: Space, action_space: Space, transition: Transi
     check_state(state_space, transition.state)
     check_action(action_space, transition.action)
     check_state(state_space, transition.new_state)
+
+
+def check_states(state_space: Space, states: np.ndarray) -> None:
+    """Check that every state in a batch of states is appropriately part of a state space.
+
+    Raises a `MalformedStateError` if any state is malformed, i.e not part of the state space.
+    """
+    if not _contains_all(state_space, states):
+        raise MalformedStateError(f"states `{states}` are not all in the agent state space `{state_space}`")
+
+
+def check_actions(action_space: Space, actions: np.ndarray) -> None:
+    """Check that every action in a batch of actions is appropriately part of an action space.
+
+    Raises a `MalformedActionError` if any action is malformed, i.e not part of the action space.
+    """
+    if not _contains_all(action_space, actions):
+        raise MalformedActionError(f"actions `{actions}` are not all in the agent action space `{action_space}`")
+
+
+def check_transitions(state_space: Space, action_space: Space, batch: BatchedTransitions) -> None:
+    """Check that a batch of transitions is appropriately formed according to given state and action spaces.
+
+    Raises a `MalformedStateError` or `MalformedActionError` if any state or action in the batch is malformed.
+    """
+    check_states(state_space, batch.states.cpu().numpy())
+    check_actions(action_space, batch.actions.cpu().numpy())
+    check_states(state_space, batch.new_states.cpu().numpy())
@@ -0,0 +1,17 @@
+"""Utilities for optionally compiling functions and modules with the PyTorch compiler."""
+
+from typing import Any, TypeVar
+
+import torch
+
+CompilableType = TypeVar("CompilableType")
+
+
+def compile_if_available(target: CompilableType, **kwargs: Any) -> CompilableType:
+    """Compile a function or module with `torch.compile` if it is available, otherwise return it as is.
+
+    `torch.compile` is only available from PyTorch 2.0 onwards; keyword arguments are forwarded to it.
+    """
+    if not hasattr(torch, "compile"):
+        return target
+    return torch.compile(target, **kwargs)  # type: ignore
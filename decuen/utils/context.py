@@ -153,5 +153,6 @@ class Contextful:
 
     def __init__(self) -> None:
         """Initialize a contextful object and populate the state an action spaces based on context."""
-        self.state_space = get_context().state_space
-        self.action_space = get_context().action_space
+        context = get_context()
+        self.state_space = context.state_space
+        self.action_space = context.action_space
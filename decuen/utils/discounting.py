@@ -0,0 +1,90 @@
+"""Numerical kernels for computing discounted quantities over trajectories.
+
+Kernels are compiled with Numba when it is installed and otherwise run as plain Python. Without Numba, discounted
+returns and generalized advantages are instead computed with SciPy's linear filters if SciPy is installed.
+"""
+
+from typing import Any, Callable
+
+import numpy as np  # type: ignore
+
+try:
+    from numba import njit  # type: ignore
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+    def njit(*_args: Any, **_kwargs: Any) -> Callable[[Callable], Callable]:  # type: ignore
+        """Stand-in for the Numba JIT decorator that leaves functions uncompiled."""
+        return lambda func: func
+
+try:
+    from scipy.signal import lfilter  # type: ignore
+except ImportError:
+    lfilter = None
+
+
+@njit(cache=True, fastmath=True)
+def discounted_returns(rewards: np.ndarray, terminals: np.ndarray, discount_factor: float) -> np.ndarray:
+    """Calculate the discounted return from every step of a trajectory given the rewards at every step.
+
+    Also takes whether every step ended an episode, in which case no return is carried over from the steps after it, so
+    that several consecutive episodes can be discounted in a single pass.
+    """
+    returns = np.empty_like(rewards)
+    running = 0.0
+    for i in range(rewards.size - 1, -1, -1):
+        if terminals[i]:
+            running = 0.0
+        running = rewards[i] + discount_factor * running
+        returns[i] = running
+    return returns
+
+
+def _filtered_discounted_returns(rewards: np.ndarray, terminals: np.ndarray, discount_factor: float) -> np.ndarray:
+    """Calculate discounted returns as a one-tap linear filter run backwards over every episode.
+
+    Equivalent to the uncompiled loop in `discounted_returns` but runs the recurrence in C.
+    """
+    returns = np.empty_like(rewards)
+    start = 0
+    for end in (*(np.flatnonzero(terminals) + 1), rewards.size):
+        if end > start:
+            returns[start:end] = lfilter([1.], [1., -discount_factor], rewards[start:end][::-1])[::-1]
+        start = end
+    return returns
+
+
+if not _NUMBA_AVAILABLE and lfilter is not None:
+    discounted_returns = _filtered_discounted_returns  # pylint: disable=invalid-name
+
+
+@njit(cache=True, fastmath=True)
+def generalized_advantages(deltas: np.ndarray, terminals: np.ndarray, discount_factor: float,
+                           trace_decay: float) -> np.ndarray:
+    """Calculate the generalized advantage estimate at every step of a trajectory.
+
+    Takes the temporal-difference error at every step and whether every step ended an episode, in which case no
+    advantage is carried over from the steps after it.
+    """
+    advantages = np.empty_like(deltas)
+    running = 0.0
+    for i in range(deltas.size - 1, -1, -1):
+        if terminals[i]:
+            running = 0.0
+        running = deltas[i] + discount_factor * trace_decay * running
+        advantages[i] = running
+    return advantages
+
+
+def _filtered_generalized_advantages(deltas: np.ndarray, terminals: np.ndarray, discount_factor: float,
+                                     trace_decay: float) -> np.ndarray:
+    """Calculate generalized advantage estimates as discounted returns of the temporal-difference errors.
+
+    Equivalent to the uncompiled loop in `generalized_advantages` but runs the recurrence in C.
+    """
+    return _filtered_discounted_returns(deltas, terminals, discount_factor * trace_decay)
+
+
+if not _NUMBA_AVAILABLE and lfilter is not None:
+    generalized_advantages = _filtered_generalized_advantages  # pylint: disable=invalid-name
@@ -0,0 +1,16 @@
+"""Environment wrappers that prepare observations for agents."""
+
+import numpy as np  # type: ignore
+from gym import ObservationWrapper  # type: ignore
+
+
+class Float32Observations(ObservationWrapper):
+    """Environment wrapper producing contiguous single-precision observations.
+
+    Agents work on single-precision states and only skip copying states they do not keep, e.g. in `Agent.act`, when the
+    states are already in that format. Wrapping an environment with this converts every observation once up front.
+    """
+
+    def observation(self, observation: np.ndarray) -> np.ndarray:
+        """Convert an observation into a contiguous single-precision array, without copying if it already is one."""
+        return np.ascontiguousarray(observation, dtype=np.float32)